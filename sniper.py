@@ -1,63 +1,279 @@
 import requests
+from requests.adapters import HTTPAdapter
+import httpx
+import asyncio
 import time
 import json
-from typing import List, Dict, Any
+import os
+import sqlite3
+import functools
+import threading
+from contextlib import contextmanager
+import orjson
+import msgspec
+from tenacity import AsyncRetrying, retry, retry_if_exception, retry_if_result, stop_after_attempt, stop_when_event_set, wait_exponential_jitter
+from cachetools import LRUCache, TTLCache, cached
+from cachetools.keys import hashkey
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import Counter, defaultdict, deque
+from typing import List, Dict, Any, Tuple, Optional, Union
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
-import pandas as pd
+from unittest.mock import patch, MagicMock, AsyncMock
+import numpy as np
 from datetime import datetime
 
 BIRDEYE_BASE_URL = "https://public-api.birdeye.so"
 SOLANA_RPC_URL = "https://api.mainnet-beta.solana.com"
+# Comma-separated RPC providers to hedge across, e.g. public, QuickNode and Helius endpoints
+SOLANA_RPC_URLS = [url for url in os.environ.get("SOLANA_RPC_URLS", SOLANA_RPC_URL).split(",") if url]
+# Hedge after a provider's p95 winning latency; HEDGE_DELAY until HEDGE_MIN_SAMPLES are in
+HEDGE_DELAY = 0.5
+HEDGE_MIN_SAMPLES = 20
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("SNIPER_MAX_CONCURRENCY", 32))
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_COOLDOWN = 30
+REQUEST_TIMEOUT = 10
+TRADES_CACHE_TTL = 30
+MEMORY_CACHE_SIZE = 100_000
+CACHE_PATH = os.environ.get("SNIPER_CACHE_PATH", os.path.expanduser("~/.sniper_cache"))
 
+# Optional Rust-backed batch HTTP client for the PnL fan-out, enabled with SNIPER_USE_RUSTY_REQ=1.
+# Off by default: rusty-req 0.4.x can abort the interpreter at exit after it has been used.
+try:
+    import rusty_req
+except ImportError:
+    rusty_req = None
+USE_RUSTY_REQ = os.environ.get("SNIPER_USE_RUSTY_REQ") == "1" and rusty_req is not None
+
+# Shared across threads so every call reuses pooled keep-alive connections.
+# requests already advertises gzip and deflate, plus zstd once backports.zstd is installed.
+SESSION = requests.Session()
+SESSION.headers.update({"x-chain": "solana"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+
+def _is_retryable(exc: BaseException) -> bool:
+    """
+    Retry rate limits, server errors and dropped connections; anything else is re-raised.
+    """
+    if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)):
+        return exc.response is not None and exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError))
+
+_RETRY_WAIT = wait_exponential_jitter(multiplier=0.2, max=5)
+_RETRY_STOP = stop_after_attempt(MAX_RETRIES)
+
+_retry = retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_RETRY_WAIT,
+    stop=_RETRY_STOP,
+    reraise=True
+)
+
+@_retry
+def _send(method, url: str, **kwargs) -> requests.Response:
+    """
+    Issue a request through a SESSION method, raising on retryable statuses so they are retried.
+    """
+    response = method(url, timeout=REQUEST_TIMEOUT, **kwargs)
+    if response.status_code in RETRY_STATUSES:
+        response.raise_for_status()
+    return response
+
+# Hedged RPC calls run here so they never wait on the callers' own thread pools
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS * len(SOLANA_RPC_URLS))
+_RPC_LOCK = threading.Lock()
+_RPC_WINS: Counter = Counter()
+_RPC_LATENCIES: Dict[str, deque] = defaultdict(lambda: deque(maxlen=200))
+
+def _hedge_delay(provider: str) -> float:
+    """
+    How long to give a provider before hedging: the p95 of its recent winning latencies.
+    """
+    with _RPC_LOCK:
+        samples = list(_RPC_LATENCIES[provider])
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DELAY
+    return float(np.percentile(samples, 95))
+
+def _rpc_post(payload: Any, hedge: bool = True) -> Optional[Any]:
+    """
+    POST a JSON-RPC payload across SOLANA_RPC_URLS, trying providers in order of past wins.
+    With hedge, the next provider is fired once the current one runs past its p95 latency;
+    without it (for heavy payloads), the next one is only tried after a failure.
+    The first 200 response wins and stops the other legs from retrying.
+    Returns the decoded body, or None if every provider fails.
+    """
+    with _RPC_LOCK:
+        providers = iter(sorted(SOLANA_RPC_URLS, key=lambda url: -_RPC_WINS[url]))
+    settled = threading.Event()
+    send = _send.retry_with(stop=_RETRY_STOP | stop_when_event_set(settled))
+    pending = {}
+    try:
+        while True:
+            url = next(providers, None)
+            if url is not None:
+                pending[_HEDGE_EXECUTOR.submit(send, SESSION.post, url, json=payload)] = (url, time.monotonic())
+            if not pending:
+                return None
+            delay = _hedge_delay(url) if hedge and url is not None else None
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider, started = pending.pop(future)
+                try:
+                    response = future.result()
+                except requests.RequestException:
+                    continue
+                if response.status_code == 200:
+                    with _RPC_LOCK:
+                        _RPC_WINS[provider] += 1
+                        _RPC_LATENCIES[provider].append(time.monotonic() - started)
+                    return orjson.loads(response.content)
+    finally:
+        settled.set()
+        for loser in pending:
+            loser.cancel()
+
+# Creation times never change, so they are memoized in memory and persisted to a SQLite file
+# at CACHE_PATH. WAL mode lets several sniper processes share the file.
+_CACHE_LOCK = threading.Lock()
+_MEMORY_CACHE: LRUCache = LRUCache(maxsize=MEMORY_CACHE_SIZE)
+_DISK_CACHES: Dict[str, sqlite3.Connection] = {}
+
+def _disk_cache() -> Optional[sqlite3.Connection]:
+    """
+    Return the connection for CACHE_PATH, opening it on first use. None when persistence is off.
+    Callers must hold _CACHE_LOCK.
+    """
+    if not CACHE_PATH:
+        return None
+    if CACHE_PATH not in _DISK_CACHES:
+        db = sqlite3.connect(CACHE_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        _DISK_CACHES[CACHE_PATH] = db
+    return _DISK_CACHES[CACHE_PATH]
+
+def _cache_get(namespace: str, key: str) -> Any:
+    """
+    Look up a cached value in memory, then on disk. Returns None on a miss.
+    """
+    cache_key = f"{namespace}:{key}"
+    with _CACHE_LOCK:
+        if cache_key in _MEMORY_CACHE:
+            return _MEMORY_CACHE[cache_key]
+        db = _disk_cache()
+        if db is None:
+            return None
+        row = db.execute("SELECT value FROM cache WHERE key = ?", (cache_key,)).fetchone()
+        if row is None:
+            return None
+        value = _MEMORY_CACHE[cache_key] = orjson.loads(row[0])
+        return value
+
+def _cache_set(namespace: str, key: str, value: Any) -> None:
+    """
+    Store a value in memory and on disk.
+    """
+    cache_key = f"{namespace}:{key}"
+    with _CACHE_LOCK:
+        _MEMORY_CACHE[cache_key] = value
+        db = _disk_cache()
+        if db is not None:
+            db.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (cache_key, orjson.dumps(value)))
+
+def _cache_forever(namespace: str):
+    """
+    Memoize a lookup keyed on its first argument. Falsy results are treated as failures and not cached.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(key, *args, **kwargs):
+            value = _cache_get(namespace, key)
+            if value is None:
+                value = func(key, *args, **kwargs)
+                if value:
+                    _cache_set(namespace, key, value)
+            return value
+        return wrapper
+    return decorator
+
+# Birdeye response schemas, decoded straight from JSON; fields not listed here are skipped.
+# Birdeye sends null for empty objects and lists, so containers are Optional.
+class TokenOverview(msgspec.Struct):
+    created_at: Optional[Union[int, float]] = None
+
+class TokenOverviewResponse(msgspec.Struct):
+    data: Optional[TokenOverview] = None
+
+class TradeItem(msgspec.Struct, frozen=True):
+    tradeAction: Optional[str] = None
+    maker: Optional[str] = None
+    buyer: Optional[str] = None
+
+class TradeList(msgspec.Struct):
+    items: Optional[List[TradeItem]] = None
+
+class TradesResponse(msgspec.Struct):
+    data: Optional[TradeList] = None
+
+@_cache_forever("token_creation_time")
 def get_token_creation_time(token_address: str, api_key: str) -> int:
     """
     Fetch the token creation time from Birdeye API.
     """
     url = f"{BIRDEYE_BASE_URL}/defi/token-overview?address={token_address}"
     headers = {
-        "x-api-key": api_key,
-        "x-chain": "solana"
+        "x-api-key": api_key
     }
-    response = requests.get(url, headers=headers)
+    response = _send(SESSION.get, url, headers=headers)
     response.raise_for_status()
-    data = response.json()
-    return data.get('data', {}).get('created_at', 0)
+    overview = msgspec.json.decode(response.content, type=TokenOverviewResponse)
+    return int((overview.data and overview.data.created_at) or 0)
 
-def get_early_trades(token_address: str, api_key: str, limit: int = 200) -> List[Dict[str, Any]]:
+# Early trades for a token barely change between reruns, so keep them for a short window
+_TRADES_CACHE = TTLCache(maxsize=1024, ttl=TRADES_CACHE_TTL)
+
+@cached(_TRADES_CACHE, key=lambda token_address, api_key, limit=200: hashkey(token_address, limit), lock=threading.Lock())
+def get_early_trades(token_address: str, api_key: str, limit: int = 200) -> List[TradeItem]:
     """
     Fetch early trades sorted by time ascending.
     """
     url = f"{BIRDEYE_BASE_URL}/defi/txs/token?address={token_address}&tx_type=swap&offset=0&limit={limit}&sort_by=timeUnix&sort_type=asc"
     headers = {
-        "x-api-key": api_key,
-        "x-chain": "solana"
+        "x-api-key": api_key
     }
-    response = requests.get(url, headers=headers)
+    response = _send(SESSION.get, url, headers=headers)
     response.raise_for_status()
-    data = response.json()
-    return data.get('data', {}).get('items', [])
+    data = msgspec.json.decode(response.content, type=TradesResponse).data
+    return (data and data.items) or []
 
-def extract_early_buyers(trades: List[Dict[str, Any]], max_buyers: int = 100) -> List[str]:
+def extract_early_buyers(trades: List[TradeItem], max_buyers: int = 100) -> List[str]:
     """
     Extract unique buyer addresses from early buy trades.
     """
-    buyers = set()
-    for trade in trades:
-        if trade.get('tradeAction') == 'buy':  # Adjusted based on possible field name
-            buyer = trade.get('maker', '') or trade.get('buyer', '')
-            if buyer:
-                buyers.add(buyer)
+    # dict keeps first-seen order while de-duplicating
+    buyers = {}
+    buy_trades = [trade for trade in trades if trade.tradeAction == 'buy']  # Adjusted based on possible field name
+    for trade in buy_trades:
+        buyer = trade.maker or trade.buyer
+        if buyer:
+            buyers[buyer] = None
             if len(buyers) >= max_buyers:
                 break
     return list(buyers)
 
-def get_wallet_creation_time(wallet_address: str) -> int:
+@_cache_forever("wallet_creation_time")
+def get_wallet_creation_time(wallet_address: str, before: Optional[Dict[str, Any]] = None) -> int:
     """
     Approximate wallet creation time by fetching the oldest transaction time via Solana RPC.
+    before is the oldest signature entry already fetched, e.g. from the batched first page;
+    paging resumes below it instead of downloading that page again.
     """
-    signatures = []
-    before = None
+    # Only the oldest page matters, so earlier pages are dropped as we go
+    last_sigs = [before] if before else []
+    before = before['signature'] if before else None
     while True:
         payload = {
             "jsonrpc": "2.0",
@@ -65,42 +281,280 @@ def get_wallet_creation_time(wallet_address: str) -> int:
             "method": "getSignaturesForAddress",
             "params": [wallet_address, {"limit": 1000, "before": before}]
         }
-        response = requests.post(SOLANA_RPC_URL, json=payload)
-        if response.status_code != 200:
+        data = _rpc_post(payload)
+        # An error body is not the end of history; returning 0 keeps a partial walk out of the cache
+        if data is None or 'error' in data or not isinstance(data.get('result'), list):
             return 0
-        data = response.json()
-        new_sigs = data.get('result', [])
-        if not new_sigs:
+        new_sigs = data['result']
+        if new_sigs:
+            last_sigs = new_sigs
+        if len(new_sigs) < 1000:
             break
-        signatures.extend(new_sigs)
         before = new_sigs[-1]['signature']
-    if signatures:
-        return signatures[-1].get('blockTime', 0)
+    if last_sigs:
+        return last_sigs[-1].get('blockTime') or 0
     return 0
 
+def get_wallet_creation_times_batch(wallet_addresses: List[str], cursors: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+    """
+    Fetch the first signature page for many wallets in one JSON-RPC batch request.
+    Only wallets whose history fits in that page are returned; the rest need paging.
+    For wallets with a full page, the oldest signature entry on it is recorded in cursors.
+    """
+    creation_times = {}
+    uncached = []
+    for wallet in wallet_addresses:
+        hit = _cache_get("wallet_creation_time", wallet)
+        if hit is None:
+            uncached.append(wallet)
+        else:
+            creation_times[wallet] = hit
+    if not uncached:
+        return creation_times
+    payload = [
+        {
+            "jsonrpc": "2.0",
+            "id": i,
+            "method": "getSignaturesForAddress",
+            "params": [wallet, {"limit": 1000}]
+        }
+        for i, wallet in enumerate(uncached)
+    ]
+    # Up to 1000 signatures per wallet; too heavy to send to every provider at once
+    data = _rpc_post(payload, hedge=False)
+    # Providers that reject batches answer with a single error object; leave every wallet to paging
+    if not isinstance(data, list):
+        return creation_times
+    for item in data:
+        if not isinstance(item, dict) or 'error' in item or not isinstance(item.get('result'), list):
+            continue
+        index = item.get('id')
+        if not isinstance(index, int) or not 0 <= index < len(uncached):
+            continue
+        sigs = item['result']
+        wallet = uncached[index]
+        if len(sigs) >= 1000:
+            if cursors is not None:
+                cursors[wallet] = sigs[-1]
+            continue
+        creation_time = (sigs[-1].get('blockTime') or 0) if sigs else 0
+        creation_times[wallet] = creation_time
+        if creation_time:
+            _cache_set("wallet_creation_time", wallet, creation_time)
+    return creation_times
+
+def _sum_realized_pnl(tokens: Dict[str, Any]) -> float:
+    """
+    Sum realized USD profit across a wallet's token PnL entries.
+    """
+    profits = np.fromiter(
+        ((item.get('pnl') or {}).get('realized_profit_usd') or 0.0 for item in tokens.values()),
+        dtype=np.float64,
+        count=len(tokens)
+    )
+    return float(profits.sum())
+
+def _parse_pnl_batch(data: Dict[str, Any], batch: List[str]) -> Dict[str, float]:
+    """
+    Map a multi-wallet PnL response to realized PnL for the wallets it covers.
+    Birdeye sends null for empty objects, so every level falls back to an empty dict.
+    """
+    wallets = data.get('data') or {}
+    return {addr: _sum_realized_pnl((wallets.get(addr) or {}).get('tokens') or {}) for addr in batch if addr in wallets}
+
+class _AdaptiveLimiter:
+    """
+    Async concurrency limiter that halves its capacity when the API starts returning 429s,
+    and restores it once THROTTLE_COOLDOWN seconds pass without another one.
+    """
+
+    def __init__(self, limit: int):
+        self.max_limit = limit
+        self.limit = limit
+        self._in_flight = 0
+        self._throttled_at = float('-inf')
+        self._condition = asyncio.Condition()
+
+    def throttle(self) -> None:
+        now = time.monotonic()
+        # Requests already in flight were admitted under the old limit, so one burst halves it once
+        if now - self._throttled_at > 1:
+            self.limit = max(1, self.limit // 2)
+        self._throttled_at = now
+
+    async def __aenter__(self):
+        async with self._condition:
+            if self.limit < self.max_limit and time.monotonic() - self._throttled_at > THROTTLE_COOLDOWN:
+                self.limit = self.max_limit
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+@_retry
+async def _get_json(client: httpx.AsyncClient, limiter: _AdaptiveLimiter, url: str, headers: Dict[str, str]) -> Any:
+    """
+    GET a Birdeye endpoint, retrying rate limits and server errors with jittered backoff.
+    """
+    async with limiter:
+        response = await client.get(url, headers=headers)
+    if response.status_code == 429:
+        limiter.throttle()
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def _fetch_pnl(client: httpx.AsyncClient, limiter: _AdaptiveLimiter, addr: str, api_key: str) -> Tuple[str, Optional[float]]:
+    """
+    Fetch realized PnL for a single wallet. The PnL is None if the lookup failed.
+    """
+    url = f"{BIRDEYE_BASE_URL}/wallet/v2/pnl?address={addr}&currency=usd"
+    headers = {
+        "x-api-key": api_key,
+        "x-chain": "solana"
+    }
+    try:
+        data = await _get_json(client, limiter, url, headers)
+        return addr, _sum_realized_pnl(data.get('tokens') or {})
+    except Exception as e:
+        print(f"Error fetching PnL for {addr}: {e}")
+        return addr, None
+
+async def _fetch_pnl_batch(client: httpx.AsyncClient, limiter: _AdaptiveLimiter, batch: List[str], api_key: str) -> Optional[Dict[str, float]]:
+    """
+    Fetch realized PnL for a batch of wallets in one request.
+    Wallets missing from the response are left out so the caller can retry them singly.
+    Returns None if the request ran out of retries on throttling or server errors, where
+    splitting the batch into single requests would only add load.
+    """
+    url = f"{BIRDEYE_BASE_URL}/wallet/v2/pnl/multiple?wallets={','.join(batch)}&currency=usd"
+    headers = {
+        "x-api-key": api_key,
+        "x-chain": "solana"
+    }
+    try:
+        data = await _get_json(client, limiter, url, headers)
+        return _parse_pnl_batch(data, batch)
+    except Exception as e:
+        print(f"Error fetching batch PnL for {len(batch)} wallets: {e}")
+        return None if _is_retryable(e) else {}
+
+async def get_wallet_pnl_async(wallet_addresses: List[str], api_key: str, batch_size: int = 50) -> Dict[str, float]:
+    """
+    Fetch realized PnL for multiple wallets concurrently, multiplexed over HTTP/2.
+    """
+    limiter = _AdaptiveLimiter(MAX_CONCURRENT_REQUESTS)
+    limits = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    async with httpx.AsyncClient(http2=True, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        batches = [wallet_addresses[i:i+batch_size] for i in range(0, len(wallet_addresses), batch_size)]
+        pnls = {}
+        failed = set()
+        for batch, batch_pnls in zip(batches, await asyncio.gather(*[_fetch_pnl_batch(client, limiter, batch, api_key) for batch in batches])):
+            if batch_pnls is None:
+                failed.update(batch)
+            else:
+                pnls.update(batch_pnls)
+        missing = [addr for addr in wallet_addresses if addr not in pnls and addr not in failed]
+        for addr, pnl in await asyncio.gather(*[_fetch_pnl(client, limiter, addr, api_key) for addr in missing]):
+            if pnl is None:
+                failed.add(addr)
+            else:
+                pnls[addr] = pnl
+    if failed:
+        print(f"PnL unavailable for {len(failed)} wallets: {', '.join(sorted(failed))}")
+    return {addr: pnls[addr] for addr in wallet_addresses if addr in pnls}
+
+async def _rusty_get_json(urls: Dict[str, str], headers: Dict[str, str], limiter: _AdaptiveLimiter) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    GET many URLs through rusty-req, keyed by tag, at most limiter.limit at a time.
+    Rate limits, server errors and dropped connections are retried in rounds with jittered backoff.
+    Returns the decoded bodies and the tags that ran out of retries; other failures are left out of both.
+    """
+    decoded = {}
+    pending = dict(urls)
+
+    async def send_round() -> Dict[str, str]:
+        nonlocal pending
+        tags = list(pending)
+        retry_urls = {}
+        start = 0
+        while start < len(tags):
+            chunk = tags[start:start + limiter.limit]
+            start += len(chunk)
+            specs = [rusty_req.RequestItem(url=pending[tag], method="GET", headers=headers, tag=tag, timeout=REQUEST_TIMEOUT) for tag in chunk]
+            results = await rusty_req.fetch_requests(specs, total_timeout=30, mode=rusty_req.ConcurrencyMode.SELECT_ALL)
+            for result in results:
+                tag = result.get("meta", {}).get("tag")
+                status = result.get("http_status")
+                if tag not in pending:
+                    continue
+                # Status 0 means the request never got a response: a timeout or dropped connection
+                if status in RETRY_STATUSES or status == 0:
+                    if status == 429:
+                        limiter.throttle()
+                    retry_urls[tag] = pending[tag]
+                elif status == 200:
+                    try:
+                        # The response envelope is itself a JSON string wrapping the body
+                        decoded[tag] = orjson.loads(orjson.loads(result["response"])["content"])
+                    except (KeyError, orjson.JSONDecodeError):
+                        continue
+        pending = retry_urls
+        return pending
+
+    # Same backoff and attempt budget as _retry; rounds repeat while retryable requests remain
+    retrying = AsyncRetrying(
+        retry=retry_if_result(bool),
+        wait=_RETRY_WAIT,
+        stop=_RETRY_STOP,
+        retry_error_callback=lambda state: state.outcome.result()
+    )
+    exhausted = await retrying(send_round)
+    return decoded, list(exhausted)
+
+async def get_wallet_pnl_rusty(wallet_addresses: List[str], api_key: str, batch_size: int = 50) -> Dict[str, float]:
+    """
+    Fetch realized PnL for multiple wallets with rusty-req, keeping socket work off the GIL.
+    """
+    headers = {
+        "x-api-key": api_key,
+        "x-chain": "solana"
+    }
+    limiter = _AdaptiveLimiter(MAX_CONCURRENT_REQUESTS)
+    batches = [wallet_addresses[i:i+batch_size] for i in range(0, len(wallet_addresses), batch_size)]
+    batch_urls = {str(i): f"{BIRDEYE_BASE_URL}/wallet/v2/pnl/multiple?wallets={','.join(batch)}&currency=usd" for i, batch in enumerate(batches)}
+    batch_data, exhausted = await _rusty_get_json(batch_urls, headers, limiter)
+    # Batches that ran out of retries are not split into singles; that would only add load
+    failed = {addr for tag in exhausted for addr in batches[int(tag)]}
+    pnls = {}
+    for tag, data in batch_data.items():
+        try:
+            pnls.update(_parse_pnl_batch(data, batches[int(tag)]))
+        except (AttributeError, TypeError) as e:
+            # A malformed batch falls back to single lookups
+            print(f"Error parsing batch PnL for {len(batches[int(tag)])} wallets: {e}")
+    missing = [addr for addr in wallet_addresses if addr not in pnls and addr not in failed]
+    single_urls = {addr: f"{BIRDEYE_BASE_URL}/wallet/v2/pnl?address={addr}&currency=usd" for addr in missing}
+    single_data, _ = await _rusty_get_json(single_urls, headers, limiter)
+    for addr in missing:
+        try:
+            pnls[addr] = _sum_realized_pnl(single_data[addr].get('tokens') or {})
+        except (KeyError, AttributeError, TypeError):
+            failed.add(addr)
+    if failed:
+        print(f"PnL unavailable for {len(failed)} wallets: {', '.join(sorted(failed))}")
+    return {addr: pnls[addr] for addr in wallet_addresses if addr in pnls}
+
 def get_wallet_pnl(wallet_addresses: List[str], api_key: str, batch_size: int = 50) -> Dict[str, float]:
     """
     Fetch realized PnL for multiple wallets using batch if possible, fallback to single.
+    Wallets whose lookups fail are left out rather than reported as 0.0.
     """
-    pnls = {}
-    for i in range(0, len(wallet_addresses), batch_size):
-        batch = wallet_addresses[i:i+batch_size]
-        for addr in batch:
-            url = f"{BIRDEYE_BASE_URL}/wallet/v2/pnl?address={addr}&currency=usd"
-            headers = {
-                "x-api-key": api_key,
-                "x-chain": "solana"
-            }
-            try:
-                response = requests.get(url, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                total_pnl = sum(item.get('pnl', {}).get('realized_profit_usd', 0) for item in data.get('tokens', {}).values())
-                pnls[addr] = total_pnl
-            except Exception as e:
-                print(f"Error fetching PnL for {addr}: {e}")
-                pnls[addr] = 0.0
-    return pnls
+    if USE_RUSTY_REQ:
+        return asyncio.run(get_wallet_pnl_rusty(wallet_addresses, api_key, batch_size))
+    return asyncio.run(get_wallet_pnl_async(wallet_addresses, api_key, batch_size))
 
 def analyze_bundle_buys(early_buyers: List[str], token_creation_time: int, new_wallet_threshold: int = 3600) -> Dict[str, Any]:
     """
@@ -108,8 +562,13 @@ def analyze_bundle_buys(early_buyers: List[str], token_creation_time: int, new_w
     """
     new_wallets = 0
     buyer_ages = {}
+    cursors = {}
+    creation_times = get_wallet_creation_times_batch(early_buyers, cursors)
+    remaining = [buyer for buyer in early_buyers if buyer not in creation_times]
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        creation_times.update(zip(remaining, executor.map(get_wallet_creation_time, remaining, [cursors.get(buyer) for buyer in remaining])))
     for buyer in early_buyers:
-        creation_time = get_wallet_creation_time(buyer)
+        creation_time = creation_times[buyer]
         age_diff = creation_time - token_creation_time if creation_time > 0 else float('inf')
         buyer_ages[buyer] = age_diff
         if 0 <= age_diff <= new_wallet_threshold:
@@ -127,12 +586,15 @@ def get_wallet_transactions(wallet_address: str, api_key: str, limit: int = 100)
     """
     url = f"{BIRDEYE_BASE_URL}/trader/txs/seek_by_time?address={wallet_address}&limit={limit}"
     headers = {
-        "x-api-key": api_key,
-        "x-chain": "solana"
+        "x-api-key": api_key
     }
-    response = requests.get(url, headers=headers)
+    try:
+        response = _send(SESSION.get, url, headers=headers)
+    except requests.RequestException:
+        # Timeouts and dropped connections that outlast the retries cost one wallet, not the strategy
+        return []
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         return data.get('data', {}).get('items', [])
     return []
 
@@ -141,44 +603,54 @@ def check_wallet_interactions(early_buyers: List[str], api_key: str) -> Dict[tup
     Check interactions between early buyers by scanning transactions.
     Counts direct transfers or swaps involving pairs.
     """
-    interactions = {}
-    buyer_set = set(early_buyers)
-    for buyer in early_buyers:
-        txs = get_wallet_transactions(buyer, api_key)
+    buyer_set = frozenset(early_buyers)
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        all_txs = list(executor.map(lambda buyer: get_wallet_transactions(buyer, api_key), early_buyers))
+    interactions = Counter()
+    for buyer, txs in zip(early_buyers, all_txs):
         for tx in txs:
-            other = tx.get('receiver', '') or tx.get('seller', '') or tx.get('buyer', '')
+            other = tx.get('receiver') or tx.get('seller') or tx.get('buyer')
             if other in buyer_set and other != buyer:
-                pair = tuple(sorted([buyer, other]))
-                interactions[pair] = interactions.get(pair, 0) + 1
+                interactions[(buyer, other) if buyer < other else (other, buyer)] += 1
     return interactions
 
+@contextmanager
+def timed(name: str, out: Dict[str, float]):
+    """
+    Record the wall-clock duration of the enclosed block into out[name].
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        out[name] = time.perf_counter() - start
+
 def implement_strategy(token_address: str, api_key: str, max_buyers: int = 100) -> Dict[str, Any]:
     """
     Implement the strategy to find and analyze early buyers.
     """
-    start_time = time.time()
-    
-    token_creation_time = get_token_creation_time(token_address, api_key)
-    token_time = time.time() - start_time
+    performance = {}
     
-    trades = get_early_trades(token_address, api_key)
-    trades_time = time.time() - start_time - token_time
-    
-    early_buyers = extract_early_buyers(trades, max_buyers)
-    buyers_time = time.time() - start_time - token_time - trades_time
-    
-    bundle_analysis = analyze_bundle_buys(early_buyers, token_creation_time)
-    bundle_time = time.time() - start_time - token_time - trades_time - buyers_time
-    
-    buyer_pnls = get_wallet_pnl(early_buyers, api_key)
-    pnl_time = time.time() - start_time - token_time - trades_time - buyers_time - bundle_time
-    
-    interactions = check_wallet_interactions(early_buyers, api_key)
-    inter_time = time.time() - start_time - token_time - trades_time - buyers_time - bundle_time - pnl_time
-    
-    good_buyers = {b: p for b, p in buyer_pnls.items() if p > 0}
-    
-    total_time = time.time() - start_time
+    with timed("total_time_seconds", performance):
+        with timed("token_fetch_time", performance):
+            token_creation_time = get_token_creation_time(token_address, api_key)
+        
+        with timed("trades_fetch_time", performance):
+            trades = get_early_trades(token_address, api_key)
+        
+        with timed("buyers_extraction_time", performance):
+            early_buyers = extract_early_buyers(trades, max_buyers)
+        
+        with timed("bundle_analysis_time", performance):
+            bundle_analysis = analyze_bundle_buys(early_buyers, token_creation_time)
+        
+        with timed("pnl_fetch_time", performance):
+            buyer_pnls = get_wallet_pnl(early_buyers, api_key)
+        
+        with timed("interactions_time", performance):
+            interactions = check_wallet_interactions(early_buyers, api_key)
+        
+        good_buyers = {b: p for b, p in buyer_pnls.items() if p > 0}
     
     return {
         "token_creation_time": datetime.fromtimestamp(token_creation_time).isoformat(),
@@ -187,64 +659,239 @@ def implement_strategy(token_address: str, api_key: str, max_buyers: int = 100)
         "buyer_pnls": buyer_pnls,
         "good_buyers": good_buyers,
         "interactions": interactions,
-        "performance": {
-            "total_time_seconds": total_time,
-            "token_fetch_time": token_time,
-            "trades_fetch_time": trades_time,
-            "buyers_extraction_time": buyers_time,
-            "bundle_analysis_time": bundle_time,
-            "pnl_fetch_time": pnl_time,
-            "interactions_time": inter_time
-        }
+        "performance": performance
     }
 
 class TestStrategy(unittest.TestCase):
     
-    @patch('requests.get')
+    def setUp(self):
+        cache_patcher = patch(f'{__name__}.CACHE_PATH', None)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        _MEMORY_CACHE.clear()
+        _TRADES_CACHE.clear()
+    
+    @patch.object(SESSION, 'get')
     def test_get_token_creation_time(self, mock_get):
         mock_response = MagicMock()
-        mock_response.json.return_value = {'data': {'created_at': 1690000000}}
+        mock_response.content = orjson.dumps({'data': {'created_at': 1690000000}})
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
         result = get_token_creation_time("test_token", "test_key")
         self.assertEqual(result, 1690000000)
+        mock_response.content = orjson.dumps({'data': {'created_at': 1690000000.0}})
+        self.assertEqual(get_token_creation_time("float_token", "test_key"), 1690000000)
+        mock_response.content = orjson.dumps({'data': None})
+        self.assertEqual(get_token_creation_time("null_token", "test_key"), 0)
     
-    @patch('requests.post')
+    @patch.object(SESSION, 'post')
     def test_get_wallet_creation_time(self, mock_post):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {'result': [{'blockTime': 1690000000}]}
-        mock_response.raise_for_status = MagicMock()
-        mock_post.return_value = mock_response
+        full_page = MagicMock(status_code=200)
+        full_page.content = orjson.dumps({'result': [{'signature': 'sig3', 'blockTime': 1690000200}] * 1000})
+        page = MagicMock(status_code=200)
+        page.content = orjson.dumps({'result': [{'signature': 'sig2', 'blockTime': 1690000100}, {'signature': 'sig1', 'blockTime': 1690000000}]})
+        mock_post.side_effect = [full_page, page]
+        result = get_wallet_creation_time("test_wallet")
+        self.assertEqual(result, 1690000000)
+        self.assertEqual(mock_post.call_count, 2)
+    
+    @patch.object(SESSION, 'post')
+    def test_get_wallet_creation_time_resumes_from_batch(self, mock_post):
+        page = MagicMock(status_code=200)
+        page.content = orjson.dumps({'result': [{'signature': 'sig1', 'blockTime': 1690000000}]})
+        mock_post.return_value = page
+        result = get_wallet_creation_time("test_wallet", {'signature': 'sig2', 'blockTime': 1690000100})
+        self.assertEqual(result, 1690000000)
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.kwargs['json']['params'][1]['before'], 'sig2')
+        # History that ends exactly at the batched page falls back to that page's oldest entry
+        page.content = orjson.dumps({'result': []})
+        self.assertEqual(get_wallet_creation_time("other_wallet", {'signature': 'sig2', 'blockTime': 1690000100}), 1690000100)
+    
+    @patch.object(SESSION, 'post')
+    def test_get_wallet_creation_time_cached(self, mock_post):
+        page = MagicMock(status_code=200)
+        page.content = orjson.dumps({'result': [{'signature': 'sig1', 'blockTime': 1690000000}]})
+        mock_post.return_value = page
+        get_wallet_creation_time("test_wallet")
         result = get_wallet_creation_time("test_wallet")
         self.assertEqual(result, 1690000000)
+        self.assertEqual(mock_post.call_count, 1)
+    
+    def test_cache_persists_to_disk(self):
+        with tempfile.TemporaryDirectory() as tmp, patch(f'{__name__}.CACHE_PATH', os.path.join(tmp, "cache.sqlite")):
+            _cache_set("wallet_creation_time", "test_wallet", 1690000000)
+            _MEMORY_CACHE.clear()
+            self.assertEqual(_cache_get("wallet_creation_time", "test_wallet"), 1690000000)
+            self.assertIsNone(_cache_get("wallet_creation_time", "other_wallet"))
+            _DISK_CACHES.pop(os.path.join(tmp, "cache.sqlite")).close()
     
-    @patch('requests.get')
+    @patch.object(SESSION, 'post')
+    def test_get_wallet_creation_time_rpc_error(self, mock_post):
+        full_page = MagicMock(status_code=200)
+        full_page.content = orjson.dumps({'result': [{'signature': 'sig2', 'blockTime': 1700000000}] * 1000})
+        error_page = MagicMock(status_code=200)
+        error_page.content = orjson.dumps({'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32019, 'message': 'Failed to query long-term storage'}})
+        mock_post.side_effect = [full_page, error_page]
+        self.assertEqual(get_wallet_creation_time("test_wallet"), 0)
+        self.assertIsNone(_cache_get("wallet_creation_time", "test_wallet"))
+    
+    @patch.object(SESSION, 'post')
+    def test_rpc_post_hedges_slow_provider(self, mock_post):
+        def post(url, json, timeout):
+            if url == "https://slow.rpc":
+                time.sleep(0.5)
+            response = MagicMock(status_code=200)
+            response.content = orjson.dumps({'result': url})
+            return response
+        mock_post.side_effect = post
+        with patch(f'{__name__}.SOLANA_RPC_URLS', ["https://slow.rpc", "https://fast.rpc"]), \
+             patch(f'{__name__}.HEDGE_DELAY', 0.05), \
+             patch.dict(_RPC_WINS, clear=True), patch.dict(_RPC_LATENCIES, clear=True):
+            result = _rpc_post({"jsonrpc": "2.0", "id": 1, "method": "getHealth"})
+            self.assertEqual(result, {'result': "https://fast.rpc"})
+            self.assertEqual(_RPC_WINS["https://fast.rpc"], 1)
+            self.assertEqual(len(_RPC_LATENCIES["https://fast.rpc"]), 1)
+            mock_post.reset_mock()
+            result = _rpc_post({"jsonrpc": "2.0", "id": 1, "method": "getHealth"}, hedge=False)
+            self.assertEqual(result, {'result': "https://fast.rpc"})
+            mock_post.assert_called_once()
+    
+    @patch.object(SESSION, 'get')
+    def test_send_retries_rate_limits(self, mock_get):
+        throttled = MagicMock(status_code=429)
+        throttled.raise_for_status.side_effect = requests.HTTPError(response=throttled)
+        ok = MagicMock(status_code=200)
+        mock_get.side_effect = [throttled, throttled, ok]
+        with patch.object(_send.retry, 'sleep'):
+            result = _send(SESSION.get, "https://example.com")
+        self.assertIs(result, ok)
+        self.assertEqual(mock_get.call_count, 3)
+    
+    def test_adaptive_limiter_halves_on_throttle(self):
+        limiter = _AdaptiveLimiter(32)
+        limiter.throttle()
+        limiter.throttle()
+        self.assertEqual(limiter.limit, 16)
+        with patch(f'{__name__}.THROTTLE_COOLDOWN', 0):
+            time.sleep(0.01)
+            asyncio.run(limiter.__aenter__())
+        self.assertEqual(limiter.limit, 32)
+    
+    @patch.object(SESSION, 'get')
     def test_get_early_trades(self, mock_get):
         mock_response = MagicMock()
-        mock_response.json.return_value = {'data': {'items': [{'tradeAction': 'buy', 'maker': 'addr1'}]}}
+        mock_response.content = orjson.dumps({'data': {'items': [{'tradeAction': 'buy', 'maker': 'addr1', 'txHash': 'tx1'}]}})
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
         result = get_early_trades("test_token", "test_key")
-        self.assertEqual(len(result), 1)
+        self.assertEqual(result, [TradeItem(tradeAction='buy', maker='addr1')])
+        get_early_trades("test_token", "other_key")
+        mock_get.assert_called_once()
+        mock_response.content = orjson.dumps({'data': {'items': None}})
+        self.assertEqual(get_early_trades("empty_token", "test_key"), [])
+        mock_response.content = orjson.dumps({'data': None})
+        self.assertEqual(get_early_trades("null_token", "test_key"), [])
     
     def test_extract_early_buyers(self):
-        trades = [{'tradeAction': 'buy', 'maker': 'addr1'}, {'tradeAction': 'sell', 'maker': 'addr2'}, {'tradeAction': 'buy', 'maker': 'addr1'}]
+        trades = [TradeItem(tradeAction='buy', maker='addr1'), TradeItem(tradeAction='sell', maker='addr2'), TradeItem(tradeAction='buy', maker='addr1')]
         result = extract_early_buyers(trades, 1)
         self.assertEqual(result, ['addr1'])
+        trades = [TradeItem(tradeAction='buy', maker='addr3'), TradeItem(tradeAction='buy', buyer='addr1'), TradeItem(tradeAction='buy', maker='addr3'), TradeItem(tradeAction='buy', maker='addr2')]
+        result = extract_early_buyers(trades, 10)
+        self.assertEqual(result, ['addr3', 'addr1', 'addr2'])
     
-    @patch('requests.get')
-    def test_get_wallet_pnl(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {'tokens': {'tok1': {'pnl': {'realized_profit_usd': 100}}}}
-        mock_response.raise_for_status = MagicMock()
-        mock_get.return_value = mock_response
-        result = get_wallet_pnl(["addr1"], "test_key")
-        self.assertEqual(result['addr1'], 100)
+    @patch(f'{__name__}.USE_RUSTY_REQ', False)
+    @patch(f'{__name__}._fetch_pnl', new_callable=AsyncMock)
+    @patch(f'{__name__}._fetch_pnl_batch', new_callable=AsyncMock)
+    def test_get_wallet_pnl(self, mock_batch, mock_single):
+        mock_batch.return_value = {'addr1': 100}
+        mock_single.side_effect = lambda client, limiter, addr, api_key: (addr, 50)
+        result = get_wallet_pnl(["addr1", "addr2"], "test_key")
+        self.assertEqual(result, {'addr1': 100, 'addr2': 50})
+        mock_single.assert_called_once()
+    
+    @patch(f'{__name__}.USE_RUSTY_REQ', True)
+    @patch(f'{__name__}.rusty_req')
+    def test_get_wallet_pnl_rusty(self, mock_rusty):
+        def fetch(specs, total_timeout, mode):
+            return [
+                {'http_status': 200, 'meta': {'tag': '0'}, 'response': orjson.dumps({'content': orjson.dumps({'data': {'addr1': {'tokens': {'tok1': {'pnl': {'realized_profit_usd': 100}}}}}}).decode()}).decode()},
+            ] if len(specs) == 1 and specs[0].tag == '0' else [
+                {'http_status': 200, 'meta': {'tag': 'addr2'}, 'response': orjson.dumps({'content': orjson.dumps({'tokens': {'tok1': {'pnl': {'realized_profit_usd': 50}}}}).decode()}).decode()},
+                {'http_status': 0, 'meta': {'tag': 'addr3'}, 'response': '{"content":"","headers":{}}', 'exception': {'type': 'HttpError'}}
+            ]
+        mock_rusty.RequestItem.side_effect = lambda **kwargs: MagicMock(**kwargs)
+        mock_rusty.fetch_requests = AsyncMock(side_effect=fetch)
+        with patch(f'{__name__}.asyncio.sleep', new_callable=AsyncMock):
+            result = get_wallet_pnl(["addr1", "addr2", "addr3"], "test_key")
+        self.assertEqual(result, {'addr1': 100, 'addr2': 50})
+        self.assertEqual(mock_rusty.fetch_requests.call_count, 1 + MAX_RETRIES)
+    
+    @patch(f'{__name__}.USE_RUSTY_REQ', False)
+    @patch(f'{__name__}._fetch_pnl', new_callable=AsyncMock)
+    @patch(f'{__name__}._get_json', new_callable=AsyncMock)
+    def test_get_wallet_pnl_throttled(self, mock_get_json, mock_single):
+        request = httpx.Request("GET", BIRDEYE_BASE_URL)
+        mock_get_json.side_effect = httpx.HTTPStatusError("429", request=request, response=httpx.Response(429, request=request))
+        result = get_wallet_pnl([f"addr{i}" for i in range(50)], "test_key")
+        self.assertEqual(result, {})
+        mock_get_json.assert_called_once()
+        mock_single.assert_not_called()
+    
+    def test_sum_realized_pnl(self):
+        tokens = {'tok1': {'pnl': {'realized_profit_usd': 100.5}}, 'tok2': {'pnl': {'realized_profit_usd': -50}}, 'tok3': {}}
+        self.assertEqual(_sum_realized_pnl(tokens), 50.5)
+        self.assertEqual(_sum_realized_pnl({}), 0.0)
+        self.assertEqual(_sum_realized_pnl({'tok1': {'pnl': None}, 'tok2': {'pnl': {'realized_profit_usd': None}}}), 0.0)
+    
+    def test_parse_pnl_batch_nulls(self):
+        self.assertEqual(_parse_pnl_batch({'data': None}, ['addr1']), {})
+        self.assertEqual(_parse_pnl_batch({'data': {'addr1': {'tokens': None}, 'addr2': None}}, ['addr1', 'addr2']), {'addr1': 0.0, 'addr2': 0.0})
+    
+    @patch.object(SESSION, 'post')
+    def test_get_wallet_creation_times_batch(self, mock_post):
+        mock_response = MagicMock(status_code=200)
+        mock_response.content = orjson.dumps([
+            {'jsonrpc': '2.0', 'id': 1, 'result': [{'signature': 'sig', 'blockTime': 1690000000}]},
+            {'jsonrpc': '2.0', 'id': 0, 'result': [{'signature': 'sig', 'blockTime': 0}] * 1000},
+            {'jsonrpc': '2.0', 'id': 2, 'result': []},
+            {'jsonrpc': '2.0', 'id': 7, 'result': []}
+        ])
+        mock_post.return_value = mock_response
+        cursors = {}
+        result = get_wallet_creation_times_batch(["addr1", "addr2", "addr3"], cursors)
+        self.assertEqual(result, {'addr2': 1690000000, 'addr3': 0})
+        self.assertEqual(cursors, {'addr1': {'signature': 'sig', 'blockTime': 0}})
+        mock_response.content = orjson.dumps({'jsonrpc': '2.0', 'error': {'code': -32600, 'message': 'batch requests are disabled'}, 'id': None})
+        self.assertEqual(get_wallet_creation_times_batch(["addr4"]), {})
     
     def test_analyze_bundle_buys(self):
-        with patch('__main__.get_wallet_creation_time', return_value=1690000000):
-            result = analyze_bundle_buys(["addr1"], 1689996400, 3600)
+        def batch(wallets, cursors):
+            cursors['addr1'] = {'signature': 'sig', 'blockTime': 1690000100}
+            return {'addr2': 1689990000}
+        with patch(f'{__name__}.get_wallet_creation_times_batch', side_effect=batch), \
+             patch(f'{__name__}.get_wallet_creation_time', return_value=1690000000) as mock_single:
+            result = analyze_bundle_buys(["addr1", "addr2"], 1689996400, 3600)
             self.assertEqual(result['num_new_wallets'], 1)
+            mock_single.assert_called_once_with("addr1", {'signature': 'sig', 'blockTime': 1690000100})
+
+    def test_check_wallet_interactions(self):
+        txs = {
+            'addr1': [{'receiver': 'addr2'}, {'receiver': '', 'seller': 'addr3'}, {'buyer': 'addr1'}, {'receiver': 'outsider'}],
+            'addr2': [{'seller': 'addr1'}],
+            'addr3': []
+        }
+        with patch(f'{__name__}.get_wallet_transactions', side_effect=lambda wallet, api_key: txs[wallet]):
+            result = check_wallet_interactions(["addr1", "addr2", "addr3"], "test_key")
+            self.assertEqual(result, {('addr1', 'addr2'): 2, ('addr1', 'addr3'): 1})
+    
+    @patch.object(SESSION, 'get')
+    def test_get_wallet_transactions_timeout(self, mock_get):
+        mock_get.side_effect = requests.Timeout("timed out")
+        with patch.object(_send.retry, 'sleep'):
+            self.assertEqual(get_wallet_transactions("addr1", "test_key"), [])
+        self.assertEqual(mock_get.call_count, MAX_RETRIES)
 
 if __name__ == "__main__":
     # Example: result = implement_strategy("TOKEN_ADDRESS", "API_KEY")